@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+
+# changelog.py - Generate CHANGELOG.md entries from git history (CLI + AI)
+# Author: Mohammad Yeganeh
+
+import argparse
+import asyncio
+import hashlib
+import io
+import os
+import re
+import shutil
+import subprocess
+import sys
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from typing import NamedTuple
+
+COMMIT_TYPES = {
+    "feat": "Feature",
+    "fix": "Fix",
+    "chore": "Chore",
+    "refactor": "Refactor",
+    "docs": "Documentation",
+    "style": "Style",
+    "test": "Test",
+    "perf": "Performance",
+    "ci": "Continuous Integration",
+    "build": "Build",
+    "revert": "Revert",
+}
+
+# Fixed ordering of changelog sections; a tuple of pairs is iterated
+# directly, with no hashing or dict view objects in the render path.
+category_titles = (
+    ("feat", "🚀 Features"),
+    ("fix", "🐛 Bug Fixes"),
+    ("perf", "⚡ Performance"),
+    ("refactor", "♻️ Refactoring"),
+    ("docs", "📚 Documentation"),
+    ("style", "🎨 Style"),
+    ("test", "🧪 Tests"),
+    ("build", "📦 Build"),
+    ("ci", "🔄 Continuous Integration"),
+    ("chore", "🧹 Chores"),
+    ("revert", "⏪ Reverts"),
+    ("other", "📝 Other Changes"),
+)
+
+
+_CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", "gitt")
+
+# Cap applied when no range is given, so a first run on a huge repo
+# doesn't walk the entire history; --limit 0 removes it.
+_DEFAULT_LIMIT = 1000
+
+# One compiled scan per record pulls out all three NUL-separated fields
+# plus any leading "[type]" subject tag in a single C-level pass.
+_RECORD_RE = re.compile(
+    rb"([^\x00]+)\x00([^\x00]*)\x00([^\x00]*)\x00(\[[^\]\x00]{1,16}\]\s*)?(.*)",
+    re.DOTALL,
+)
+_KNOWN_TYPES = frozenset(t.encode() for t in COMMIT_TYPES)
+
+
+class Commit(NamedTuple):
+    hash: str
+    date: str
+    author: str
+    message: str
+    type: str
+
+
+@lru_cache(maxsize=1)
+def _today():
+    """Today's date stamp, formatted once per run."""
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def load_env():
+    """Load environment variables from ~/.config/gitt/.env if present."""
+    env_file = os.path.join(_CONFIG_DIR, ".env")
+    if not os.path.isfile(env_file):
+        return
+    with open(env_file) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, _, value = line.partition("=")
+            os.environ.setdefault(key, value)
+
+
+def get_last_tag():
+    """Return the most recent tag reachable from HEAD, or None."""
+    result = subprocess.run(
+        ["git", "describe", "--tags", "--abbrev=0"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+def get_git_commits(since=None, limit=None, rev_range=None):
+    """Stream commits from git log, one raw record at a time.
+
+    Uses Popen with a pipe so parsing can start before git finishes
+    walking the history, instead of buffering the whole log in memory.
+    Records are RS-terminated (0x1e) with NUL-separated fields, so
+    parsing stays unambiguous even when an author name or subject
+    contains '|' or a newline. Yields undecoded bytes records.
+
+    A rev_range like "v1.2..HEAD" is preferred over --since where
+    possible: git walks the commit graph directly instead of parsing
+    and comparing dates on every commit.
+    """
+    cmd = ["git", "log", "--pretty=format:%h%x00%ad%x00%an%x00%s%x1e", "--date=short"]
+    if rev_range:
+        cmd.append(rev_range)
+    if since:
+        cmd.append(f"--since={since}")
+    if limit:
+        cmd.append(f"-n{limit}")
+
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=1024 * 1024,
+    )
+    # Accumulate into a bytearray and slice records out through a
+    # memoryview: appends are amortized in place and the undecoded tail
+    # is trimmed with del, so the buffer is never reallocated wholesale.
+    buffer = bytearray()
+    read = proc.stdout.read
+    while True:
+        chunk = read(64 * 1024)
+        if not chunk:
+            break
+        buffer += chunk
+        start = 0
+        with memoryview(buffer) as view:
+            while True:
+                end = buffer.find(b"\x1e", start)
+                if end == -1:
+                    break
+                record = bytes(view[start:end]).strip(b"\n")
+                if record:
+                    yield record
+                start = end + 1
+        del buffer[:start]
+    record = bytes(buffer).strip(b"\n")
+    if record:
+        yield record
+    proc.wait()
+    if proc.returncode != 0:
+        stderr = proc.stderr.read().decode("utf-8", "replace").strip()
+        raise RuntimeError(f"git log failed: {stderr}")
+
+
+def parse_commits(records, categories=None):
+    """Parse raw git log records, bucketing commits by type in one pass.
+
+    Parsing and categorization are fused so the history is walked once:
+    each Commit goes straight into its per-type list instead of through
+    an intermediate flat list. Returns the categories dict.
+    """
+    if categories is None:
+        categories = {key: [] for key, _ in category_titles}
+    match = _RECORD_RE.match
+    for commit in records:
+        m = match(commit)
+        if m is None:
+            continue
+
+        tag = m.group(4)
+        commit_type = "other"
+        raw_message = m.group(5)
+        if tag:
+            candidate = tag[1:tag.index(b"]")].lower()
+            if candidate in _KNOWN_TYPES:
+                commit_type = sys.intern(candidate.decode())
+            else:
+                raw_message = tag + raw_message
+
+        # Authors and types repeat across most of the history; interning
+        # collapses the duplicates to one string object each.
+        categories[commit_type].append(Commit(
+            m.group(1).decode("utf-8", "replace"),
+            m.group(2).decode("utf-8", "replace"),
+            sys.intern(m.group(3).decode("utf-8", "replace")),
+            raw_message.decode("utf-8", "replace"),
+            commit_type,
+        ))
+    return categories
+
+
+def parse_commits_parallel(records, jobs, chunk_size=5000):
+    """Parse records in a process pool, merging per-chunk buckets.
+
+    Chunks of raw records are shipped to worker processes and the
+    returned buckets merged in submission order, so per-category commit
+    order matches the serial parser. Pickling overhead means this only
+    pays off on very large histories; the fused serial pass stays the
+    default.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    categories = {key: [] for key, _ in category_titles}
+    futures = []
+    batch = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for record in records:
+            batch.append(record)
+            if len(batch) >= chunk_size:
+                futures.append(pool.submit(parse_commits, batch))
+                batch = []
+        if batch:
+            futures.append(pool.submit(parse_commits, batch))
+        for future in futures:
+            for key, commits in future.result().items():
+                categories[key].extend(commits)
+    return categories
+
+
+def generate_basic_changelog(categories, version=None, out=None):
+    """Render a Markdown changelog section from categorized commits.
+
+    Writes lines straight to ``out`` (any text stream) rather than
+    accumulating a list and joining it. When no stream is passed the
+    rendered section is returned as a string.
+    """
+    return_string = out is None
+    if return_string:
+        out = io.StringIO()
+
+    date = _today()
+    header = f"## [{version}] - {date}" if version else f"## {date}"
+    out.write(header)
+    out.write("\n\n")
+    for key, title in category_titles:
+        commits = categories.get(key, [])
+        if not commits:
+            continue
+        out.write(f"### {title}\n\n")
+        for commit in commits:
+            out.write(f"- {commit.message} ({commit.hash})\n")
+        out.write("\n")
+    if return_string:
+        return out.getvalue()
+    return None
+
+
+def setup_gemini():
+    """Configure the Gemini client from GEMINI_API_KEY, if available.
+
+    google.generativeai is imported lazily here so the common non-AI
+    path never pays its import cost at startup.
+    """
+    try:
+        import google.generativeai as genai
+    except ImportError:
+        print("⚠️ google-generativeai is not installed. Falling back to basic changelog.", file=sys.stderr)
+        return None
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        print("⚠️ GEMINI_API_KEY is not configured. Falling back to basic changelog.", file=sys.stderr)
+        return None
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel("gemini-1.5-flash")
+
+
+# Commits per Gemini request; larger histories are split into chunks of
+# this size and the requests issued concurrently.
+_AI_CHUNK_SIZE = 200
+
+
+def _ai_prompt(commits_text):
+    return (
+        "You are a changelog generator. Given the commit list below, write "
+        "concise Markdown changelog subsections grouped by change type "
+        "(### Features, ### Bug Fixes, etc.). Only output the Markdown. "
+        "Commits:\n\n"
+        f"{commits_text}"
+    )
+
+
+async def _generate_ai_sections(model, chunks):
+    async def _one(chunk):
+        response = await model.generate_content_async(_ai_prompt(chunk))
+        return response.text or ""
+
+    return await asyncio.gather(*map(_one, chunks))
+
+
+def generate_ai_changelog(categories, version=None):
+    """Ask Gemini to write a changelog section from the parsed commits.
+
+    Histories larger than _AI_CHUNK_SIZE commits are split into chunks
+    and the per-chunk requests run concurrently with asyncio.gather, so
+    total latency is one round trip instead of one per chunk.
+
+    Responses are cached under ~/.config/gitt/ai-cache keyed on the
+    exact commit-hash range and version label, so rerunning over an
+    unchanged history costs no API calls.
+    """
+    commit_hashes = [c.hash for commits in categories.values() for c in commits]
+    cache_key = hashlib.sha256(
+        "\n".join(commit_hashes + [version or ""]).encode()
+    ).hexdigest()
+    cache_path = os.path.join(_CONFIG_DIR, "ai-cache", f"{cache_key}.md")
+    if os.path.isfile(cache_path):
+        with open(cache_path) as f:
+            return f.read()
+
+    model = setup_gemini()
+    if model is None:
+        return None
+
+    # Join over a lazy generator of pre-formatted lines: islice carves
+    # out each chunk without materializing the full line list or making
+    # slice copies.
+    lines = (
+        f"- [{c.type}] {c.message} ({c.hash}, {c.author}, {c.date})"
+        for commits in categories.values()
+        for c in commits
+    )
+    chunks = []
+    while True:
+        chunk = "\n".join(islice(lines, _AI_CHUNK_SIZE))
+        if not chunk:
+            break
+        chunks.append(chunk)
+
+    try:
+        if len(chunks) == 1:
+            # Stream the response and write pieces as they arrive rather
+            # than blocking on the fully generated section.
+            out = io.StringIO()
+            for piece in model.generate_content(_ai_prompt(chunks[0]), stream=True):
+                out.write(piece.text or "")
+            sections = [out.getvalue()]
+        else:
+            sections = asyncio.run(_generate_ai_sections(model, chunks))
+    except Exception as exc:
+        print(f"❌ Gemini request failed: {exc}", file=sys.stderr)
+        return None
+
+    body = "\n\n".join(s.strip() for s in sections if s.strip())
+    if not body:
+        return None
+
+    date = _today()
+    header = f"## [{version}] - {date}" if version else f"## {date}"
+    result = f"{header}\n\n{body}"
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w") as f:
+        f.write(result)
+    return result
+
+
+def save_changelog(content, path="CHANGELOG.md", append=True):
+    """Write the changelog, prepending to any existing file.
+
+    Prepending writes the new section to a temp file, streams the old
+    file after it in fixed-size chunks, then atomically renames over the
+    original — the old changelog is never read into memory.
+    """
+    if append and os.path.isfile(path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as new, open(path) as old:
+            new.write(content.rstrip("\n"))
+            new.write("\n\n")
+            shutil.copyfileobj(old, new)
+        os.replace(tmp_path, path)
+    else:
+        with open(path, "w") as f:
+            f.write(content.rstrip("\n") + "\n")
+    print(f"✅ Changelog written to {path}")
+
+
+def write_changelog_stream(render, path="CHANGELOG.md", append=True):
+    """Render the changelog straight into the output file.
+
+    ``render`` receives the open text stream. In append mode it writes
+    into a temp file, the old changelog is streamed in after it, and
+    the temp file is renamed into place — no intermediate changelog
+    string is ever assembled.
+    """
+    if append and os.path.isfile(path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as new, open(path) as old:
+            render(new)
+            new.write("\n")
+            shutil.copyfileobj(old, new)
+        os.replace(tmp_path, path)
+    else:
+        with open(path, "w") as f:
+            render(f)
+    print(f"✅ Changelog written to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate CHANGELOG.md entries from git history.")
+    parser.add_argument("--since", help="only include commits after this date (e.g. 2026-01-01)")
+    parser.add_argument("--since-tag", action="store_true", help="only include commits since the last tag")
+    parser.add_argument("--limit", type=int, help=f"maximum number of commits to include (default {_DEFAULT_LIMIT} when no range is given; 0 for unlimited)")
+    parser.add_argument("--jobs", type=int, default=1, help="parse with N worker processes (only pays off on very large histories)")
+    parser.add_argument("--version", help="version label for the changelog header")
+    parser.add_argument("--ai", action="store_true", help="generate the changelog with Gemini AI")
+    parser.add_argument("--output", default="CHANGELOG.md", help="output file (default: CHANGELOG.md)")
+    args = parser.parse_args()
+
+    load_env()
+
+    rev_range = None
+    if args.since_tag:
+        tag = get_last_tag()
+        if tag:
+            rev_range = f"{tag}..HEAD"
+        else:
+            print("⚠️ No tags found; including the whole history.", file=sys.stderr)
+
+    limit = args.limit
+    if limit is None and not args.since and rev_range is None:
+        limit = _DEFAULT_LIMIT
+        print(f"ℹ️ Limiting to the {_DEFAULT_LIMIT} most recent commits; pass --limit 0 for the full history.", file=sys.stderr)
+    if limit == 0:
+        limit = None
+
+    try:
+        records = get_git_commits(since=args.since, limit=limit, rev_range=rev_range)
+        if args.jobs > 1:
+            categories = parse_commits_parallel(records, args.jobs)
+        else:
+            categories = parse_commits(records)
+    except (RuntimeError, OSError) as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    if not any(categories.values()):
+        print("📭 No commits found.")
+        sys.exit(0)
+
+    content = None
+    if args.ai:
+        content = generate_ai_changelog(categories, version=args.version)
+
+    if content is not None:
+        save_changelog(content, path=args.output)
+    else:
+        write_changelog_stream(
+            lambda out: generate_basic_changelog(categories, version=args.version, out=out),
+            path=args.output,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ usage() {
     echo "  gitt              - Run CLI version"
     echo "  gitt --gui        - Run Streamlit GUI version"
     echo "  gitt --config-api - Configure Cloudflare API key"
+    echo "  gitt --changelog  - Generate CHANGELOG.md from git history"
     echo "  gitt --help       - Show this help message"
     exit 1
 }
@@ -178,6 +179,13 @@ case "${1:-}" in
     --config-api)
         configure_api_key
         ;;
+    --changelog)
+        shift
+        python3 "$(dirname "$(readlink -f "$0")")/changelog.py" "$@"
+        ;;
+    --gui)
+        streamlit run "$(dirname "$(readlink -f "$0")")/gui.py"
+        ;;
     --help|-h)
         usage
         ;;
@@ -0,0 +1,1428 @@
+#!/usr/bin/env python3
+
+# gui.py - Streamlit GUI for gitt: stage files and write commit messages with AI
+# Author: Mohammad Yeganeh
+
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import io
+import json
+import logging
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+import threading
+import time
+import types
+from collections import Counter, deque
+from heapq import nlargest
+from operator import itemgetter
+
+import streamlit as st
+
+# pandas and plotly are imported lazily where used: only the
+# Analytics queries need them, and their combined import costs
+# hundreds of ms plus a large chunk of RSS that the Commit tab's
+# first paint should not pay.
+
+# Resolved once: Path.home() can hit env/passwd lookups per call.
+HOME = str(pathlib.Path.home())
+
+CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", "gitt")
+ENV_FILE = os.path.join(CONFIG_DIR, ".env")
+LOG_FILE = os.path.join(CONFIG_DIR, "gitt.log")
+
+# One immutable table for the whole process; MappingProxyType keeps
+# callers from mutating what every helper instance shares.
+_COMMIT_TYPES = types.MappingProxyType({
+    "feat": "Feature",
+    "fix": "Fix",
+    "chore": "Chore",
+    "refactor": "Refactor",
+    "docs": "Documentation",
+    "style": "Style",
+    "test": "Test",
+    "perf": "Performance",
+    "ci": "Continuous Integration",
+    "build": "Build",
+    "revert": "Revert",
+})
+
+# Display strings are formatted once here; the selectbox format_func
+# becomes a plain dict lookup per option.
+_COMMIT_TYPE_LABELS = types.MappingProxyType({
+    "none": "No specific type",
+    **{k: f"{k} - {v}" for k, v in _COMMIT_TYPES.items()},
+})
+
+# Porcelain status code -> human description, dispatched via dict.get
+# instead of an if/elif ladder per file.
+_STATUS_MAP = {
+    "A ": "Added",
+    "AM": "Added",
+    "M ": "Modified",
+    " M": "Modified",
+    "MM": "Modified",
+    "D ": "Deleted",
+    " D": "Deleted",
+    "R ": "Renamed",
+    "RM": "Renamed",
+    "C ": "Copied",
+    "CM": "Copied",
+    "??": "New file",
+}
+
+# Porcelain status code -> picker icon; module-level so it is built
+# once, not on every rerun of main().
+_STATUS_ICONS = {
+    "A ": "🆕",
+    "AM": "🆕",
+    "M ": "✏️",
+    " M": "✏️",
+    "MM": "✏️",
+    "D ": "🗑️",
+    " D": "🗑️",
+    "R ": "🔀",
+    "RM": "🔀",
+    "C ": "📋",
+    "CM": "📋",
+    "??": "❓",
+}
+
+# Overlaps the fork+exec latency of independent read-only git queries.
+_DIFF_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+
+# Compiled once: splitting a combined diff on its headers happens per
+# Generate click, and the split itself runs in C instead of a Python
+# loop over every diff line. The header capture takes the b/ (post-
+# rename) path, matching the filenames git status reports.
+_DIFF_SPLIT_RE = re.compile(r"(?m)^(?=diff --git )")
+_DIFF_HDR_RE = re.compile(r"diff --git a/.* b/(.*)")
+
+# Leading "[type]" tag on a commit subject.
+_TYPE_RE = re.compile(r"^\[([^\]]+)\]")
+
+# Gemini free tier allows ~15 requests per minute; going over earns
+# 429s and backoff stalls, so the UI throttles itself first.
+_GEMINI_RPM_LIMIT = 15
+
+# Generated messages keyed on (diff digest, commit type, selection).
+# Module-level so a repository switch (which rebuilds the helper)
+# keeps the cache warm; insertion order doubles as the LRU order.
+_AI_RESPONSES = {}
+_AI_RESPONSES_MAX = 32
+
+# git resolved once at import; otherwise every spawn repeats the PATH
+# search. The slim environment keeps exec from copying the whole
+# Streamlit environment into each child.
+_GIT_BIN = shutil.which("git") or "git"
+_GIT_ENV = {
+    key: value
+    for key, value in os.environ.items()
+    if key in ("PATH", "HOME", "TMPDIR") or key.startswith("GIT_")
+}
+# C locale skips UTF-8 collation in git's own processing, and optional
+# locks keep every read-only call from taking .git/index.lock and
+# serializing against a running editor. (core.fsmonitor is left to the
+# user's git config since enabling it starts a daemon per repo.)
+_GIT_ENV["LC_ALL"] = "C"
+_GIT_ENV.setdefault("GIT_OPTIONAL_LOCKS", "0")
+
+
+# Walking .git can touch tens of thousands of pack and object files;
+# the size shown in the metadata row is cosmetic, so one walk per five
+# minutes is plenty.
+_GIT_SIZE_TTL = 300.0
+_GIT_SIZE_CACHE = {}
+
+
+def _git_dir_size(repo):
+    """Total size of .git in bytes, walked in-process and cached."""
+    now = time.monotonic()
+    cached = _GIT_SIZE_CACHE.get(repo)
+    if cached is not None and now - cached[0] < _GIT_SIZE_TTL:
+        return cached[1]
+    total = 0
+    for root, _dirs, files in os.walk(os.path.join(repo, ".git")):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    _GIT_SIZE_CACHE[repo] = (now, total)
+    return total
+
+
+def _human_size(total):
+    """Render a byte count the way du -h would."""
+    size = float(total)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{total} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def _compact_diff(text, per_file_limit=4000, total_limit=50000):
+    """Bound a diff for the AI prompt, fairly across files.
+
+    A flat prefix slice spends the whole budget on whichever file git
+    happened to emit first; capping per file keeps every changed file
+    represented while the total stays well inside the model's context.
+    """
+    out = []
+    total = 0
+    for hunk in _DIFF_SPLIT_RE.split(text):
+        if not hunk:
+            continue
+        chunk = hunk[:per_file_limit]
+        if len(chunk) < len(hunk):
+            chunk += "\n… (file diff truncated)\n"
+        if total + len(chunk) > total_limit:
+            out.append("… (remaining files omitted)\n")
+            break
+        out.append(chunk)
+        total += len(chunk)
+    return "".join(out)
+
+
+@functools.lru_cache(maxsize=32)
+def _find_git_dir(cwd):
+    """Walk cwd and its parents for a .git entry, without a subprocess.
+
+    The answer is stable for the process lifetime, so the lru_cache
+    makes repeat checks free across Streamlit reruns.
+    """
+    path = pathlib.Path(cwd).resolve()
+    for candidate in (path, *path.parents):
+        if (candidate / ".git").exists():
+            return str(candidate)
+    return None
+
+
+class GitHelper:
+    # Shared immutable tables; the class attributes just give callers
+    # the familiar helper-level names.
+    commit_types = _COMMIT_TYPES
+    commit_type_labels = _COMMIT_TYPE_LABELS
+
+    def __init__(self, cwd=None):
+        # Normalized once so no call site needs a "self.cwd or ..."
+        # fallback; every subprocess and stat below routes through it.
+        self.cwd = cwd or "."
+        # stdin=DEVNULL keeps any misbehaving git invocation from
+        # blocking on a terminal the GUI doesn't have.
+        self._run = functools.partial(
+            subprocess.run, cwd=self.cwd, stdin=subprocess.DEVNULL, env=_GIT_ENV
+        )
+        self.api_key = os.getenv("GEMINI_API_KEY")
+        self._status_cache = None
+        self._diff_cache = {}
+        self._recent_cache = None
+
+    def is_git_repository(self):
+        return _find_git_dir(self.cwd) is not None
+
+    # Worktree edits and new untracked files don't touch .git/index
+    # (and --no-optional-locks deliberately keeps status from writing
+    # it), so like the diff cache the mtime key alone can't see them;
+    # the short TTL bounds how stale a hit can be.
+    _STATUS_TTL = 3.0
+
+    def _read_status(self):
+        """Porcelain status entries, shared and cached per index state.
+
+        One git status -z serves both the file list and the change
+        summary for a few seconds per index state; NUL termination
+        keeps filenames with spaces or newlines intact. Parses on
+        bytes and decodes only the filename; the two status bytes are
+        ASCII by construction.
+        """
+        mtime = _index_mtime(self.cwd)
+        now = time.monotonic()
+        if (
+            self._status_cache is not None
+            and self._status_cache[0] == mtime
+            and now - self._status_cache[1] < self._STATUS_TTL
+        ):
+            return self._status_cache[2]
+        # --no-optional-locks keeps this read-only poll from writing
+        # .git/index and contending with a concurrent add/commit.
+        result = self._run(
+            [
+                _GIT_BIN, "--no-optional-locks", "-c", "core.untrackedCache=true",
+                "status", "--porcelain", "-z",
+            ],
+            capture_output=True,
+        )
+        entries = []
+        if result.returncode == 0:
+            fields = result.stdout.split(b"\x00")
+            i = 0
+            while i < len(fields):
+                entry = fields[i]
+                if len(entry) > 3:
+                    status = entry[:2].decode("ascii")
+                    filename = os.fsdecode(entry[3:])
+                    old_filename = None
+                    if status[0] in "RC":
+                        # The next NUL field is the rename/copy source.
+                        i += 1
+                        old_filename = os.fsdecode(fields[i])
+                    entries.append((status, filename, old_filename))
+                i += 1
+        self._status_cache = (mtime, now, entries)
+        return entries
+
+    def get_git_status(self):
+        """Return the changed files as [{"status", "filename", "old_filename"}, ...]."""
+        return [
+            {"status": status, "filename": filename, "old_filename": old_filename}
+            for status, filename, old_filename in self._read_status()
+        ]
+
+    # Diff output past this size is truncated: Gemini's context window
+    # makes the tail irrelevant, and unbounded capture_output would pin
+    # a whole refactor-sized diff in memory.
+    _DIFF_CAP = 200_000
+
+    def _run_capped(self, cmd, max_bytes=_DIFF_CAP):
+        """Run a command, streaming stdout and truncating at max_bytes.
+
+        Output is read in 64 KB chunks and the process killed once the
+        cap is reached, so neither the bytes past the cap nor their
+        UTF-8 decode are ever paid for. Returns (text, truncated), with
+        text None if the command failed.
+        """
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.cwd,
+            env=_GIT_ENV,
+        )
+        buf = bytearray()
+        fd = proc.stdout.fileno()
+        truncated = False
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            buf += chunk
+            if len(buf) >= max_bytes:
+                truncated = True
+                proc.kill()
+                break
+        proc.stdout.close()
+        if proc.wait() != 0 and not truncated:
+            return None, False
+        return bytes(buf[:max_bytes]).decode("utf-8", "replace"), truncated
+
+    def _has_any_changes(self):
+        """Cheap change probe: --quiet diffs exit 1 only when changes exist."""
+        if self._run([_GIT_BIN, "diff", "--cached", "--quiet"]).returncode != 0:
+            return True
+        return self._run([_GIT_BIN, "diff", "--quiet"]).returncode != 0
+
+    # Worktree edits don't touch .git/index, so the mtime key alone
+    # can't see them; the short TTL bounds how stale a hit can be.
+    _DIFF_TTL = 5.0
+
+    def get_git_diff(self, files=None):
+        """Return the staged diff, falling back to the unstaged one.
+
+        Results are memoized per (selection, index state) for a few
+        seconds: the diff preview and the AI prompt both ask for the
+        same diff within one interaction, and a plain dict keyed on the
+        inputs beats an lru_cache that can't see the index change.
+        """
+        key = (tuple(files) if files else None, _index_mtime(self.cwd))
+        now = time.monotonic()
+        cached = self._diff_cache.get(key)
+        if cached is not None and now - cached[0] < self._DIFF_TTL:
+            return cached[1]
+        diff = self._compute_diff(files)
+        self._diff_cache[key] = (now, diff)
+        return diff
+
+    def _compute_diff(self, files=None):
+        if not files and not self._has_any_changes():
+            return ""
+        suffix = ["--"] + list(files) if files else []
+        # A --quiet probe (exit 1 iff changes) decides staged vs
+        # unstaged first, so only one full diff is ever generated
+        # instead of producing the staged one just to find it empty.
+        staged = self._run(
+            [_GIT_BIN, "diff", "--cached", "--quiet"] + suffix
+        ).returncode != 0
+        cmd = [_GIT_BIN, "diff", "--cached"] if staged else [_GIT_BIN, "diff"]
+        out, truncated = self._run_capped(cmd + suffix)
+        if not out:
+            return ""
+        if truncated:
+            out += "\n… (diff truncated)\n"
+        return out
+
+    def get_combined_diff(self, files=None):
+        """Staged plus unstaged changes in one call via git diff HEAD.
+
+        The AI prompt wants everything the commit could contain, and
+        diffing against HEAD captures both sides in a single subprocess
+        instead of a staged pass plus an unstaged fallback. Falls back
+        to the regular diff in a repository with no commits yet.
+        """
+        key = ("HEAD", tuple(files) if files else None, _index_mtime(self.cwd))
+        now = time.monotonic()
+        cached = self._diff_cache.get(key)
+        if cached is not None and now - cached[0] < self._DIFF_TTL:
+            return cached[1]
+        suffix = ["--"] + list(files) if files else []
+        out, truncated = self._run_capped([_GIT_BIN, "diff", "HEAD"] + suffix)
+        if out is None:
+            return self.get_git_diff(files)
+        if truncated:
+            out += "\n… (diff truncated)\n"
+        self._diff_cache[key] = (now, out)
+        return out
+
+    def get_file_stats(self):
+        """Return the diffstat for the pending changes.
+
+        The same --quiet probe as _compute_diff picks staged vs
+        unstaged up front, so only one diffstat is ever rendered.
+        """
+        staged = self._run(
+            [_GIT_BIN, "diff", "--cached", "--quiet"]
+        ).returncode != 0
+        cmd = [_GIT_BIN, "diff", "--cached", "--stat"] if staged else [_GIT_BIN, "diff", "--stat"]
+        out, _ = self._run_capped(cmd)
+        return out or ""
+
+    def _collect_diffs(self):
+        """Split one combined git diff into per-file hunks.
+
+        One staged diff plus one unstaged fallback replaces the
+        per-file `git diff -- <file>` fan-out, so a commit touching N
+        files costs two subprocesses instead of N.
+        """
+        diffs = {}
+        results = _DIFF_POOL.map(
+            lambda cmd: self._run(cmd, capture_output=True),
+            ([_GIT_BIN, "diff", "--cached"], [_GIT_BIN, "diff"]),
+        )
+        for result in results:
+            if result.returncode != 0 or not result.stdout:
+                continue
+            text = result.stdout.decode("utf-8", "replace")
+            for chunk in _DIFF_SPLIT_RE.split(text):
+                match = _DIFF_HDR_RE.match(chunk)
+                if match is None:
+                    continue  # preamble before the first header
+                # Keyed by the b/ path so renamed files land under the
+                # name status reports, not their pre-rename one.
+                diffs.setdefault(match.group(1), chunk.rstrip("\n"))
+        return diffs
+
+    def get_file_changes_summary(self):
+        """Describe each changed file with its change type and diff hunk."""
+        entries = self._read_status()
+        if not entries:
+            return {}
+        diffs = self._collect_diffs()
+        return {
+            filename: {
+                "type": _STATUS_MAP.get(status, "Changed"),
+                "diff": diffs.get(filename, ""),
+            }
+            for status, filename, _ in entries
+        }
+
+    def get_recent_commits_context(self):
+        """Last few commit subjects, refreshed only when HEAD moves.
+
+        The history behind HEAD changes only on commit/checkout, so the
+        rendered log is cached against the HEAD part of the repo
+        fingerprint — two file reads, no fork at all on a hit.
+        """
+        sha = _repo_fingerprint(self.cwd)[:2]
+        if self._recent_cache is not None and self._recent_cache[0] == sha:
+            return self._recent_cache[1]
+        result = self._run(
+            [_GIT_BIN, "log", "--oneline", "-5"],
+            capture_output=True,
+        )
+        text = result.stdout.decode("utf-8", "replace") if result.returncode == 0 else ""
+        self._recent_cache = (sha, text)
+        return text
+
+    def _collect_context(self, selected_files=None):
+        """Gather diffstat, per-file change types, and recent history.
+
+        The diffstat reuses get_file_stats (whose --quiet probe picks
+        staged vs unstaged, so one stat is rendered), the change types
+        come straight from the cached status entries — no extra fork
+        and no name-status parsing to misread — and the recent history
+        comes from the HEAD-keyed cache, so it usually costs no fork
+        at all.
+        """
+        changes = {
+            filename: _STATUS_MAP.get(status, "Changed")
+            for status, filename, _ in self._read_status()
+        }
+        return (
+            self.get_file_stats().rstrip("\n"),
+            changes,
+            self.get_recent_commits_context(),
+        )
+
+    async def _gather_analysis(self):
+        """Run the repository analysis queries concurrently.
+
+        The overall stat, recent history, and short status are
+        independent read-only commands, so asyncio.gather overlaps
+        their fork+exec and I/O instead of paying for them serially.
+        """
+        async def run(*cmd):
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                cwd=self.cwd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=_GIT_ENV,
+            )
+            out, _ = await proc.communicate()
+            return out.decode("utf-8", "replace") if proc.returncode == 0 else ""
+
+        return await asyncio.gather(
+            run(_GIT_BIN, "diff", "HEAD", "--stat"),
+            run(_GIT_BIN, "log", "--oneline", "-5"),
+            run(_GIT_BIN, "status", "--short"),
+        )
+
+    def analyze_repository(self):
+        """Synchronous wrapper for the concurrent analysis queries."""
+        return asyncio.run(self._gather_analysis())
+
+    def generate_commit_message(self, commit_type, selected_files=None, on_chunk=None):
+        """Ask Gemini for a commit message based on the pending changes.
+
+        The response is streamed; ``on_chunk`` (if given) receives the
+        accumulated text after each piece, so the UI can render partial
+        output instead of freezing for the whole generation. Responses
+        are memoized per (diff digest, commit type) so re-clicking
+        Generate on unchanged input skips the API round-trip entirely.
+        """
+        if not self.api_key:
+            return None
+
+        diff_content = self.get_combined_diff(selected_files)
+        if not diff_content.strip():
+            return None
+        diff_content = _compact_diff(diff_content)
+
+        digest = hashlib.blake2b(diff_content.encode(), digest_size=16).digest()
+        cache_key = (digest, commit_type, tuple(sorted(selected_files or [])))
+        cached = _AI_RESPONSES.get(cache_key)
+        if cached is not None:
+            if on_chunk:
+                on_chunk(cached)
+            return cached
+
+        file_stats, file_changes, recent_commits = self._collect_context(selected_files)
+
+        change_summary = ""
+        if file_changes:
+            change_summary = "\n\nFile Changes Summary:\n" + "".join(
+                f"- {filename}: {change_type}\n"
+                for filename, change_type in file_changes.items()
+            )
+
+        if commit_type and commit_type != "none":
+            type_context = f"The commit type is '{commit_type}' ({self.commit_types.get(commit_type, '')})."
+        else:
+            type_context = "No specific commit type was selected."
+
+        prompt = f"""You are a Git commit message generator. Output only a short, clear,
+imperative commit message (max 12 words). Use imperative verbs (e.g. Remove,
+Simplify, Update). Never include or repeat the commit type in the message.
+No punctuation. No explanations. Only the message content.
+
+{type_context}
+
+File Statistics:
+{file_stats}
+{change_summary}
+Recent Commit History (for context):
+{recent_commits}
+
+Git Diff:
+{diff_content}
+"""
+        try:
+            model = _get_gemini_model(self.api_key)
+            response = model.generate_content(prompt, stream=True)
+            parts = []
+            for chunk in response:
+                parts.append(chunk.text or "")
+                if on_chunk:
+                    on_chunk("".join(parts))
+            message = "".join(parts).strip() or None
+            if message:
+                if len(_AI_RESPONSES) >= _AI_RESPONSES_MAX:
+                    _AI_RESPONSES.pop(next(iter(_AI_RESPONSES)))
+                _AI_RESPONSES[cache_key] = message
+            return message
+        except Exception:
+            return None
+
+    # Character budget for one batched prompt; over-marshalling a huge
+    # prompt costs more latency than the saved round-trips.
+    _BATCH_PROMPT_BUDGET = 8000
+
+    def generate_commit_messages_batch(self, files_diffs):
+        """One-line commit titles for several files in one API call.
+
+        ``files_diffs`` is a list of ``(filename, diff)`` pairs. The
+        diffs are marshalled into a single delimited prompt asking for
+        a JSON array, so N files cost one network round-trip (and one
+        slot against the rate limit) instead of N. Inputs past the
+        prompt budget split into further calls. Returns a dict mapping
+        filename to suggested title; files the model skipped are
+        absent.
+        """
+        if not self.api_key or not files_diffs:
+            return {}
+
+        model = _get_gemini_model(self.api_key)
+        results = {}
+
+        def flush(batch):
+            sections = "".join(
+                f"===FILE: {name}===\n{diff}\n" for name, diff in batch
+            )
+            prompt = (
+                "You are a Git commit message generator. For each file "
+                "below, produce a short, clear, imperative commit title "
+                "(max 12 words). Respond with only a JSON array of "
+                "strings, one per file, in the same order as the files. "
+                "No explanations.\n\n" + sections
+            )
+            try:
+                text = model.generate_content(prompt).text.strip()
+                # The model may wrap the array in a markdown fence.
+                if text.startswith("```"):
+                    text = text.strip("`")
+                    text = text.partition("\n")[2] or text
+                titles = json.loads(text)
+            except Exception:
+                return
+            if isinstance(titles, list):
+                for (name, _), title in zip(batch, titles):
+                    if isinstance(title, str) and title.strip():
+                        results[name] = title.strip()
+
+        batch = []
+        size = 0
+        for name, diff in files_diffs:
+            diff = _compact_diff(diff, total_limit=self._BATCH_PROMPT_BUDGET)
+            if batch and size + len(diff) > self._BATCH_PROMPT_BUDGET:
+                flush(batch)
+                batch = []
+                size = 0
+            batch.append((name, diff))
+            size += len(diff)
+        flush(batch)
+        return results
+
+    # Past this many paths the argv gets long enough to be worth the
+    # pathspec-from-file pipe instead.
+    _PATHSPEC_ARGV_MAX = 500
+
+    def get_git_metadata(self):
+        """Headline repository facts for the Analytics tab.
+
+        The four git queries are independent and each just blocks on a
+        subprocess, so they run concurrently: wall time is the slowest
+        single command instead of the sum of all four.
+        """
+        def text_of(cmd):
+            result = self._run(cmd, capture_output=True)
+            if result.returncode != 0:
+                return ""
+            return result.stdout.decode("utf-8", "replace").strip()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+            futures = {
+                "toplevel": pool.submit(
+                    text_of, [_GIT_BIN, "rev-parse", "--show-toplevel"]
+                ),
+                "branch": pool.submit(
+                    text_of, [_GIT_BIN, "branch", "--show-current"]
+                ),
+                "total_commits": pool.submit(
+                    text_of, [_GIT_BIN, "rev-list", "--count", "HEAD"]
+                ),
+                "remote": pool.submit(
+                    text_of, [_GIT_BIN, "remote", "get-url", "origin"]
+                ),
+            }
+        toplevel = futures["toplevel"].result()
+        return {
+            "name": os.path.basename(toplevel) if toplevel else "?",
+            "branch": futures["branch"].result(),
+            "total_commits": futures["total_commits"].result(),
+            "remote": futures["remote"].result(),
+            "repo_size": _human_size(_git_dir_size(self.cwd)),
+        }
+
+    def _popen(self, cmd):
+        """Popen with the helper's cwd/env, stdout piped for streaming.
+
+        Long-history commands go through here so their output is
+        consumed as it is produced instead of materializing the whole
+        stream (and a second split copy of it) in memory first.
+        """
+        return subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.cwd,
+            env=_GIT_ENV,
+        )
+
+    def _stream_lines(self, cmd):
+        """Yield decoded lines from a streaming git command."""
+        proc = self._popen(cmd)
+        with io.TextIOWrapper(proc.stdout, encoding="utf-8", errors="replace") as out:
+            for line in out:
+                yield line.rstrip("\n")
+        proc.wait()
+
+    def get_bulk_log(self, limit=500):
+        """Commit history, author stats, and file stats from one walk.
+
+        One `git log --all --numstat` stream replaces the four
+        commands these views used to fork (the 500-commit history, a
+        shortlog, an author numstat walk, and a name-only walk). Each
+        record is a \x1f-joined header line followed by that commit's
+        numstat rows, so a single pass derives all three DataFrames;
+        only the first `limit` commits are kept as history rows while
+        the aggregates cover everything.
+        """
+        import pandas as pd
+
+        # \x1f (unit separator) cannot appear in names or subjects,
+        # unlike tabs or pipes, so no field can corrupt the parse.
+        hashes = []
+        hist_authors = []
+        emails = []
+        dates = []
+        subjects = []
+        author_totals = {}  # name -> [commits, added, removed]
+        file_counts = {}
+        current = None
+        for row in self._stream_lines(
+            [
+                _GIT_BIN, "log", "--all",
+                "--pretty=format:%H%x1f%an%x1f%ae%x1f%aI%x1f%s",
+                "--numstat",
+            ]
+        ):
+            if "\x1f" in row:
+                parts = row.split("\x1f")
+                if len(parts) == 5:
+                    current = author_totals.setdefault(parts[1], [0, 0, 0])
+                    current[0] += 1
+                    if len(hashes) < limit:
+                        hashes.append(parts[0])
+                        hist_authors.append(parts[1])
+                        emails.append(parts[2])
+                        dates.append(parts[3])
+                        subjects.append(parts[4])
+                    continue
+            if row and current is not None and "\t" in row:
+                added, removed, path = row.split("\t", 2)
+                file_counts[path] = file_counts.get(path, 0) + 1
+                if added.isdigit() and removed.isdigit():
+                    current[1] += int(added)
+                    current[2] += int(removed)
+
+        commits = pd.DataFrame(
+            {
+                "hash": hashes,
+                "author": hist_authors,
+                "email": emails,
+                "date": dates,
+                "subject": subjects,
+            }
+        )
+        commits["type"] = (
+            commits["subject"]
+            .str.extract(_TYPE_RE, expand=False)
+            .str.lower()
+            .fillna("other")
+        )
+
+        by_commits = sorted(
+            author_totals.items(), key=lambda item: item[1][0], reverse=True
+        )
+        authors = pd.DataFrame(
+            {
+                "author": [name for name, _ in by_commits],
+                "commits": [t[0] for _, t in by_commits],
+                "lines_added": [t[1] for _, t in by_commits],
+                "lines_removed": [t[2] for _, t in by_commits],
+            }
+        )
+
+        # nlargest picks the top 20 in O(n log 20); one stat per file
+        # (deleted files just read as size 0) instead of an exists
+        # probe plus a getsize.
+        filenames = []
+        changes = []
+        sizes = []
+        for filename, count in nlargest(20, file_counts.items(), key=itemgetter(1)):
+            try:
+                size = os.stat(os.path.join(self.cwd, filename)).st_size
+            except OSError:
+                size = 0
+            filenames.append(filename)
+            changes.append(count)
+            sizes.append(size)
+        file_stats = pd.DataFrame(
+            {"filename": filenames, "changes": changes, "size_bytes": sizes}
+        )
+
+        return {"commits": commits, "authors": authors, "file_stats": file_stats}
+
+    def get_branch_info(self):
+        """Local branches with their last commit date."""
+        import pandas as pd
+
+        result = self._run(
+            [
+                _GIT_BIN, "for-each-ref", "refs/heads",
+                "--format=%(refname:short)|%(committerdate:iso8601-strict)|%(objectname:short)",
+            ],
+            capture_output=True,
+        )
+        names = []
+        dates = []
+        heads = []
+        if result.returncode == 0:
+            for line in result.stdout.decode("utf-8", "replace").splitlines():
+                if not line:
+                    continue
+                parts = line.split("|")
+                if len(parts) == 3:
+                    names.append(parts[0])
+                    dates.append(parts[1])
+                    heads.append(parts[2])
+        return pd.DataFrame(
+            {"branch": names, "last_commit_date": dates, "head": heads}
+        )
+
+    def add_files(self, files):
+        if not files:
+            return False
+        files = list(files)
+        changed = {filename for _, filename, _ in self._read_status()}
+        if changed and changed.issubset(files):
+            # Everything is selected: one "." pathspec lets git walk
+            # the tree itself instead of matching N explicit paths.
+            files = ["."]
+        if len(files) > self._PATHSPEC_ARGV_MAX:
+            # NUL-separated paths on stdin sidestep argv length limits
+            # and any quoting concerns (stdin=None overrides the
+            # partial's DEVNULL so input= can attach the pipe).
+            result = self._run(
+                [_GIT_BIN, "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                input=b"\x00".join(os.fsencode(f) for f in files),
+                stdin=None,
+                capture_output=True,
+            )
+        else:
+            result = self._run([_GIT_BIN, "add"] + files, capture_output=True)
+        self._diff_cache.clear()
+        return result.returncode == 0
+
+    def commit_changes(self, message, all_tracked=False):
+        """Create the commit; with all_tracked, stage tracked changes too.
+
+        ``git commit -am`` folds the add and the commit into one
+        subprocess when the selection is exactly the tracked change
+        set; untracked files still need an explicit add first.
+        """
+        cmd = [_GIT_BIN, "commit", "-am" if all_tracked else "-m", message]
+        result = self._run(
+            cmd,
+            capture_output=True,
+        )
+        output = (result.stdout + result.stderr).decode("utf-8", "replace")
+        self._diff_cache.clear()
+        self._recent_cache = None
+        return result.returncode == 0, output
+
+
+def _index_mtime(cwd):
+    """mtime of .git/index, used to invalidate caches when the index changes."""
+    try:
+        return os.stat(os.path.join(cwd, ".git", "index")).st_mtime_ns
+    except OSError:
+        return 0
+
+
+@st.cache_resource
+def _get_gemini_model(api_key):
+    """One configured model per key, shared across sessions and reruns.
+
+    cache_resource keeps the SDK's warm HTTP session alive instead of
+    rebuilding it for every helper instance or repository switch. The
+    SDK import lives here so startup never pays for it when no key is
+    configured.
+    """
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel("gemini-1.5-flash")
+
+
+@st.cache_resource
+def _load_env():
+    """Read the config .env once per process, deferring the dotenv import."""
+    from dotenv import load_dotenv
+
+    load_dotenv(ENV_FILE)
+    return True
+
+
+@st.cache_resource
+def _get_logger():
+    """File logger for staging/commit/AI events, built once per process.
+
+    cache_resource guarantees a single FileHandler; attaching one per
+    rerun would duplicate every line.
+    """
+    logger = logging.getLogger("gitt")
+    if not logger.handlers:
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+        )
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def _tail(path, n=100, block=8192):
+    """Last n lines of a file without reading the whole thing.
+
+    Seeks to EOF and walks backwards block by block until enough
+    newlines are buffered, so cost stays O(n lines) no matter how
+    large the log grows.
+    """
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            data = b""
+            while pos > 0 and data.count(b"\n") <= n:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+    except OSError:
+        return []
+    return [
+        line.decode("utf-8", "replace") for line in data.splitlines()[-n:]
+    ]
+
+
+@st.cache_data(ttl=30)
+def _quick_dirs(home):
+    """Non-hidden directories under home, from a single scandir pass."""
+    try:
+        return [
+            e.path for e in os.scandir(home)
+            if e.is_dir(follow_symlinks=False) and not e.name.startswith(".")
+        ]
+    except OSError:
+        return []
+
+
+@st.cache_data(ttl=3, max_entries=64)
+def _cached_status(cwd, index_mtime, _helper):
+    return _helper.get_git_status()
+
+
+# Keyed on the .git/index mtime rather than a git write-tree hash: the
+# stat is free while write-tree would fork the very subprocess the
+# cache exists to avoid, and the index mtime moves on every staging
+# change anyway. max_entries bounds memory across file selections.
+@st.cache_data(ttl=3, max_entries=32)
+def _cached_diff(cwd, index_mtime, files, _helper):
+    return _helper.get_git_diff(list(files) if files else None)
+
+
+def _repo_fingerprint(repo):
+    """Cheap repository-state fingerprint: two file reads and a stat.
+
+    The tuple (HEAD content, resolved ref, index mtime) changes on any
+    commit, checkout, or stage, but costs no subprocess — unlike the
+    rev-parse fork it replaces as the per-rerun cache key.
+    """
+    git_dir = os.path.join(repo, ".git")
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            head = f.read().strip()
+    except OSError:
+        head = ""
+    ref = ""
+    if head.startswith("ref: "):
+        try:
+            with open(os.path.join(git_dir, *head[5:].split("/"))) as f:
+                ref = f.read().strip()
+        except OSError:
+            # The ref may live in packed-refs after a gc; its mtime
+            # still moves when the branch does.
+            try:
+                ref = str(os.stat(os.path.join(git_dir, "packed-refs")).st_mtime_ns)
+            except OSError:
+                pass
+    return head, ref, _index_mtime(repo)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_analytics(repo, head, ref, index_mtime, _helper):
+    """All analytics queries, memoized per repository state.
+
+    The key carries the repo fingerprint, so widget-only reruns are
+    pure cache hits while a commit or stage changes the key and forces
+    a refresh. One bundle (rather than per-query cached wrappers)
+    keeps the thread-pool fan-out on the miss path without calling
+    Streamlit cache functions from worker threads.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+        futures = {
+            "metadata": pool.submit(_helper.get_git_metadata),
+            "bulk": pool.submit(_helper.get_bulk_log, 500),
+            "branches": pool.submit(_helper.get_branch_info),
+        }
+    results = {name: future.result() for name, future in futures.items()}
+    bulk = results.pop("bulk")
+    results.update(bulk)
+    return results
+
+
+def _format_final(message, commit_type):
+    """Commit message with its [type] prefix applied at most once."""
+    message = message.strip()
+    if not message or commit_type == "none" or message.startswith("["):
+        return message
+    return f"[{commit_type}] {message}"
+
+
+def _render_commit_tab(git_helper, current_dir):
+    """Stage files, pick a type, and create the commit."""
+    index_mtime = _index_mtime(current_dir)
+    # Reruns fire on every widget interaction; within 300 ms of the
+    # last fetch the previous answer is reused outright, skipping even
+    # the cache-key stat churn while the user is clicking around.
+    now = time.monotonic()
+    if (
+        now - st.session_state.get("_status_ts", 0.0) < 0.3
+        and "_status_files" in st.session_state
+    ):
+        files = st.session_state["_status_files"]
+    else:
+        files = _cached_status(current_dir, index_mtime, git_helper)
+        st.session_state["_status_ts"] = now
+        st.session_state["_status_files"] = files
+    if not files:
+        st.info("📭 No changes to commit.")
+        return
+
+    st.subheader("📁 Changed files")
+    add_all = st.checkbox("Add all changes")
+    if add_all:
+        # The selection is forced to everything, so building and
+        # reconciling the table would be pure overhead; the cached
+        # status list gives the count for free.
+        st.info(f"📦 All {len(files)} changed files will be added.")
+        selected_files = [file_info["filename"] for file_info in files]
+    else:
+        # One data_editor is a single widget for Streamlit to
+        # reconcile and round-trip, instead of one checkbox per
+        # changed file, and the boolean column scales to hundreds of
+        # rows without N widgets.
+        rows = [
+            {
+                "stage": False,
+                "status": _STATUS_ICONS.get(file_info["status"], "📄"),
+                "file": file_info["filename"],
+                "was": file_info.get("old_filename") or "",
+            }
+            for file_info in files
+        ]
+        edited = st.data_editor(
+            rows,
+            hide_index=True,
+            use_container_width=True,
+            num_rows="fixed",
+            disabled=("status", "file", "was"),
+            column_config={"stage": st.column_config.CheckboxColumn("stage")},
+            key=f"file_table:{current_dir}:{index_mtime}",
+        )
+        selected_files = [row["file"] for row in edited if row["stage"]]
+
+    commit_type = st.selectbox(
+        "Commit type",
+        ["none"] + list(git_helper.commit_types.keys()),
+        format_func=git_helper.commit_type_labels.get,
+    )
+
+    if st.checkbox("Show Diff Preview"):
+        if selected_files:
+            diff = _cached_diff(current_dir, index_mtime, tuple(selected_files), git_helper)
+            st.code(diff or "No diff available.", language="diff")
+        else:
+            st.caption("Select files to preview their diff.")
+
+    with st.expander("🔍 File Analysis"):
+        stats, recent, short_status = git_helper.analyze_repository()
+        st.text(stats or "No pending changes against HEAD.")
+        if short_status:
+            st.code(short_status, language="text")
+        if recent:
+            st.caption("Recent commits")
+            st.code(recent, language="text")
+
+    # A finished background generation hands its result over here on
+    # the next script run, where session_state is safe to touch.
+    job = st.session_state.get("ai_job")
+    if job is not None and job["done"]:
+        del st.session_state["ai_job"]
+        if job["message"]:
+            st.session_state.ai_message = job["message"]
+        else:
+            _get_logger().warning("AI generation failed in %s", current_dir)
+            st.error("❌ Failed to generate a commit message.")
+        job = None
+    ai_busy = job is not None
+
+    if st.button("🤖 Generate with AI", disabled=ai_busy):
+        if not git_helper.api_key:
+            st.warning("Configure GEMINI_API_KEY in the sidebar first.")
+        else:
+            # Sliding one-minute window of dispatch times: refusing
+            # here is cheap, while letting Gemini answer 429 stalls
+            # the UI behind the SDK's exponential backoff.
+            calls = st.session_state.setdefault("gemini_calls", deque())
+            now_ts = time.time()
+            while calls and now_ts - calls[0] > 60:
+                calls.popleft()
+            if len(calls) >= _GEMINI_RPM_LIMIT:
+                wait = 60 - (now_ts - calls[0])
+                st.warning(f"⏳ Rate limit reached — try again in {wait:.0f}s.")
+            else:
+                calls.append(now_ts)
+                # The round-trip runs on a daemon thread writing into a
+                # plain holder dict, so the script run (and every other
+                # widget) stays responsive for the multi-second wait.
+                holder = {"done": False, "message": None}
+                st.session_state["ai_job"] = holder
+
+                def _generate():
+                    try:
+                        holder["message"] = git_helper.generate_commit_message(
+                            commit_type, selected_files
+                        )
+                    finally:
+                        holder["done"] = True
+
+                threading.Thread(target=_generate, daemon=True).start()
+                st.rerun()
+
+    if ai_busy:
+        with st.spinner("🤖 Generating commit message…"):
+            time.sleep(0.4)
+        st.rerun()
+
+    commit_message = st.text_area(
+        "Commit message",
+        value=st.session_state.get("ai_message", ""),
+    )
+
+    # Computed exactly once per rerun; the preview and the commit
+    # handler both reference this local so they can never disagree.
+    final_message = _format_final(commit_message, commit_type)
+    if final_message:
+        st.caption(f"Final message: `{final_message}`")
+
+    def _invalidate_caches():
+        """Drop cached status/diff state after the index was mutated."""
+        _cached_status.clear()
+        _cached_diff.clear()
+        git_helper._status_cache = None
+        git_helper._diff_cache.clear()
+        _cached_analytics.clear()
+        st.session_state.pop("_status_ts", None)
+        st.session_state.pop("_status_files", None)
+
+    logger = _get_logger()
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("➕ Add Files"):
+            # Both paths go through the helper's prebuilt run partial
+            # (shared slim env, cwd, DEVNULL stdin) instead of wiring
+            # up a fresh subprocess call here.
+            if add_all:
+                added = git_helper.add_files(["."])
+            else:
+                added = git_helper.add_files(selected_files)
+            if added:
+                # No forced rerun: invalidating the caches is enough
+                # for the next interaction to show fresh state, and a
+                # toast survives where st.success would be wiped.
+                _invalidate_caches()
+                logger.info(
+                    "Staged %s in %s",
+                    "all changes" if add_all else f"{len(selected_files)} file(s)",
+                    current_dir,
+                )
+                st.toast("✅ Files added.")
+            else:
+                st.error("❌ No files selected.")
+    with col2:
+        if st.button("✅ Commit"):
+            if not final_message:
+                st.error("❌ Commit message is required.")
+            else:
+                # -am is only safe when the selection is exactly the
+                # tracked changes: untracked files need a real add.
+                tracked = {f["filename"] for f in files if f["status"] != "??"}
+                untracked = {f["filename"] for f in files if f["status"] == "??"}
+                selected = set(selected_files)
+                all_tracked = bool(tracked) and tracked <= selected and not (selected & untracked)
+                ok, output = git_helper.commit_changes(final_message, all_tracked=all_tracked)
+                if ok:
+                    # Balloons cost real client-side frames; fast mode
+                    # settles for a toast.
+                    if st.session_state.get("fast_mode"):
+                        st.toast("✅ Committed.")
+                    else:
+                        st.success("✅ Commit created successfully!")
+                        st.balloons()
+                    # No explicit rerun: the next interaction refreshes,
+                    # and the status cache re-keys on .git/index mtime.
+                    st.session_state.ai_message = ""
+                    _invalidate_caches()
+                    logger.info("Committed in %s: %s", current_dir, final_message)
+                else:
+                    logger.error("Commit failed in %s: %s", current_dir, output)
+                    st.error(f"❌ Failed to create commit:\n{output}")
+
+
+
+def _build_analytics_view(data):
+    """Derive the chart frames and figures shown by the Analytics tab.
+
+    Separated from rendering so the result can live in session_state:
+    the groupbys and Plotly figure construction are pure functions of
+    the queried data and need not repeat on widget-only reruns.
+    """
+    import pandas as pd
+    import plotly.express as px
+
+    commits = data["commits"]
+    authors = data["authors"]
+    view = {
+        "metadata": data["metadata"],
+        "n_authors": len(authors),
+        "file_stats": data["file_stats"],
+        "figures": [],
+        "branches": None,
+    }
+
+    if not commits.empty:
+        commits["date"] = pd.to_datetime(commits["date"], utc=True)
+        # floor("D") stays datetime64 where .dt.date would box every
+        # row into a Python date object and push the column (and the
+        # groupby) onto the object-dtype slow path.
+        commits["day"] = commits["date"].dt.floor("D")
+        daily = commits.groupby("day", sort=True).size().reset_index(name="count")
+        view["figures"].append(
+            px.line(daily, x="day", y="count", title="Commits per day")
+        )
+        type_counts = commits["type"].value_counts().reset_index()
+        type_counts.columns = ["type", "count"]
+        view["figures"].append(
+            px.pie(type_counts, names="type", values="count", title="Commit types")
+        )
+
+    if not authors.empty:
+        authors["total_lines"] = authors["lines_added"] + authors["lines_removed"]
+        view["figures"].append(
+            px.bar(authors.head(10), x="author", y="commits", title="Top authors")
+        )
+
+    branches = data["branches"]
+    if not branches.empty:
+        # for-each-ref emits strict ISO 8601, so naming the format
+        # skips inference, and parsing straight to UTC then dropping
+        # the tz builds the naive column in one vectorized pass
+        # instead of parse + tz check + localize copies.
+        branches["last_commit_date"] = pd.to_datetime(
+            branches["last_commit_date"], utc=True, format="ISO8601"
+        ).dt.tz_localize(None)
+        now = pd.Timestamp.utcnow().tz_localize(None)
+        branches["days_since_last_commit"] = (now - branches["last_commit_date"]).dt.days
+        view["branches"] = branches
+
+    return view
+
+
+def _render_analytics_tab(git_helper):
+    """Repository analytics: history, authors, files, and branches.
+
+    The queries run concurrently on a cache miss (see
+    _cached_analytics), and the derived frames and figures persist in
+    session_state keyed on the repo fingerprint, so a widget-only
+    rerun replays ready-made objects instead of redoing groupbys and
+    figure construction.
+    """
+    repo = git_helper.cwd
+    fp_key = (repo,) + _repo_fingerprint(repo)
+    if st.session_state.get("analytics_fp") != fp_key:
+        data = _cached_analytics(repo, *fp_key[1:], git_helper)
+        st.session_state["analytics_view"] = _build_analytics_view(data)
+        st.session_state["analytics_fp"] = fp_key
+    view = st.session_state["analytics_view"]
+    metadata = view["metadata"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Branch", metadata.get("branch") or "?")
+    col2.metric("Commits", metadata.get("total_commits") or "0")
+    col3.metric("Authors", view["n_authors"])
+    col4.metric(".git size", metadata.get("repo_size") or "?")
+
+    for figure in view["figures"]:
+        st.plotly_chart(figure, use_container_width=True)
+
+    if not view["file_stats"].empty:
+        st.subheader("🔥 Most-changed files")
+        st.dataframe(view["file_stats"], use_container_width=True)
+
+    if view["branches"] is not None:
+        st.subheader("🌿 Branch activity")
+        st.dataframe(view["branches"], use_container_width=True)
+
+
+def _log_level(line):
+    """Level field of a formatted log line, or '' for odd lines."""
+    parts = line.split(" ", 3)
+    return parts[2] if len(parts) > 2 else ""
+
+
+def _render_logs_tab():
+    """Recent entries from the gitt log file."""
+    # Bounded tail instead of readlines()[-100:]: the log only grows,
+    # and a rerun fires on every widget click.
+    recent_logs = _tail(LOG_FILE, 100)
+    if not recent_logs:
+        st.info("📭 No log entries yet.")
+        return
+
+    # The formatter writes "DATE TIME LEVEL message", so the level is
+    # the third token: one bounded split per line at a known position
+    # instead of a substring scan per candidate level (which could
+    # also false-match a level word inside a message).
+    counts = Counter(_log_level(line) for line in recent_logs)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Entries", len(recent_logs))
+    col2.metric("Info", counts["INFO"])
+    col3.metric("Warnings", counts["WARNING"])
+    col4.metric("Errors", counts["ERROR"])
+    st.code("\n".join(recent_logs), language="text")
+
+
+def main():
+    st.set_page_config(page_title="gitt", page_icon="📝")
+    _load_env()
+    st.title("📝 gitt")
+    st.caption("Write better commit messages with AI")
+
+    quick_dirs = [os.getcwd(), HOME] + _quick_dirs(HOME)
+    current_dir = st.sidebar.selectbox("Repository", quick_dirs)
+
+    with st.sidebar.expander("🔐 Gemini API Key"):
+        key = st.text_input("GEMINI_API_KEY", type="password")
+        if st.button("Save Key"):
+            from dotenv import load_dotenv, set_key
+
+            os.makedirs(CONFIG_DIR, exist_ok=True)
+            # set_key edits its target in place, so the edit is staged
+            # in a 0600 sibling copy and os.replace'd in: the update is
+            # atomic (a crash mid-write can never leave a half-written
+            # .env) and the key never sits on disk with wider
+            # permissions, even for a brand-new file.
+            tmp_file = ENV_FILE + ".tmp"
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as tmp:
+                if os.path.isfile(ENV_FILE):
+                    with open(ENV_FILE) as src:
+                        tmp.write(src.read())
+            set_key(tmp_file, "GEMINI_API_KEY", key.strip(), quote_mode="never")
+            os.chmod(tmp_file, 0o600)
+            os.replace(tmp_file, ENV_FILE)
+            # override makes the new key visible to this process right
+            # away — no app reload needed.
+            load_dotenv(ENV_FILE, override=True)
+            if "git_helper" in st.session_state:
+                st.session_state.git_helper.api_key = os.getenv("GEMINI_API_KEY")
+            st.success("✅ Key saved.")
+
+    if st.session_state.get("git_helper_dir") != current_dir:
+        st.session_state.git_helper = GitHelper(current_dir)
+        st.session_state.git_helper_dir = current_dir
+    git_helper = st.session_state.git_helper
+
+    if not git_helper.is_git_repository():
+        st.error("❌ Not a git repository.")
+        return
+
+    st.sidebar.toggle(
+        "⚡ Fast mode",
+        key="fast_mode",
+        help="Skip the balloon animation after commits.",
+    )
+    if st.sidebar.button("🔄 Refresh Status"):
+        # The helper-level caches must go too, or the cleared outer
+        # caches would just re-read the same stale entries from them.
+        _cached_status.clear()
+        _cached_diff.clear()
+        git_helper._status_cache = None
+        git_helper._diff_cache.clear()
+        st.session_state.pop("_status_ts", None)
+        st.session_state.pop("_status_files", None)
+
+    tab1, tab2, tab3 = st.tabs(["📝 Commit", "📊 Analytics", "🪵 Logs"])
+    with tab1:
+        _render_commit_tab(git_helper, current_dir)
+    with tab2:
+        _render_analytics_tab(git_helper)
+    with tab3:
+        _render_logs_tab()
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,8 @@ install_script() {
     sudo mkdir -p "$TARGET_DIR"
     sudo cp gitt.sh "$TARGET_DIR/gitt"
     sudo chmod +x "$TARGET_DIR/gitt"
+    sudo cp changelog.py "$TARGET_DIR/changelog.py"
+    sudo cp gui.py "$TARGET_DIR/gui.py"
     echo "gitt has been installed to $TARGET_DIR."
     echo "You can run it by typing 'gitt' in your terminal."
 }